@@ -2,12 +2,22 @@
 Gemini API wrapper for file uploads and content generation.
 """
 
+import gzip
+import hashlib
 import os
+import random
+import re
+import secrets
+import threading
 import time
 import json
+import zlib
 import requests
+from json.encoder import encode_basestring_ascii
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 
 class GeminiAPI:
@@ -16,11 +26,32 @@ class GeminiAPI:
     UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
     FILES_URL = "https://generativelanguage.googleapis.com/v1beta/files"
     GENERATE_URL_TEMPLATE = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+    STREAM_GENERATE_URL_TEMPLATE = "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent"
+    CACHES_URL = "https://generativelanguage.googleapis.com/v1beta/cachedContents"
+
+    # Explicit caches below this size are rejected by the API
+    MIN_CACHE_TOKENS = 4096
+
+    # Files are uploaded in pieces of this size (a multiple of the protocol's 256 KiB
+    # granularity), so a failed piece can be resumed without resending the rest
+    UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+    UPLOAD_RETRIES = 3
+
+    # JSON request bodies above this size (e.g. merge prompts) are sent gzipped
+    GZIP_MIN_BYTES = 16 * 1024
+
+    # Strings longer than this are JSON-escaped in slices of this many characters
+    STREAM_ESCAPE_CHARS = 1 << 20
+
+    # Uploaded files are deleted by the API after 48 hours; stop reusing them a bit earlier
+    UPLOAD_REUSE_SECONDS = 47 * 60 * 60
 
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "gemini-3-pro-preview"
+        model: str = "gemini-3-pro-preview",
+        pool_maxsize: int = 16,
+        manifest_path: Optional[Path] = None
     ):
         """
         Initialize the Gemini API client.
@@ -28,6 +59,9 @@ class GeminiAPI:
         Args:
             api_key: Google AI API key. If not provided, reads from GEMINI_API_KEY env var.
             model: Model to use for generation. Default is gemini-3-pro-preview.
+            pool_maxsize: Maximum number of keep-alive connections to hold open.
+            manifest_path: Optional JSON file recording uploads by content hash, so
+                          identical files are reused without listing remote files.
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -36,6 +70,137 @@ class GeminiAPI:
             )
         self.model = model
         self.generate_url = self.GENERATE_URL_TEMPLATE.format(model=model)
+        self.stream_generate_url = self.STREAM_GENERATE_URL_TEMPLATE.format(model=model)
+
+        # One session for all calls so connections (and their TLS handshakes) are
+        # reused. Retries only apply to idempotent methods, not uploads/generation.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        ))
+
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        # Stands in for the file URI in request bodies built by prepare_template().
+        # Random, so it can't collide with text that happens to be in a prompt.
+        self._file_uri_placeholder = f"__FILE_URI_{secrets.token_hex(16)}__"
+        self._manifest_lock = threading.Lock()
+
+    @staticmethod
+    def _file_hash(filepath: Path) -> str:
+        """Compute the SHA-256 of a file's contents."""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_manifest(self) -> dict:
+        """Load the upload manifest, or an empty one if missing or unreadable."""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: dict):
+        """Write the upload manifest, dropping entries too old to reuse."""
+        now = time.time()
+        manifest = {
+            k: v for k, v in manifest.items()
+            if now - v.get("uploaded_at", 0) < self.UPLOAD_REUSE_SECONDS
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def _manifest_key(self, content_hash: str) -> str:
+        """Manifest key for a content hash, scoped to this API key's uploads."""
+        key_digest = hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        return f"{key_digest}:{content_hash}"
+
+    def _lookup_manifest(self, content_hash: str) -> Optional[dict]:
+        """
+        Return the manifest entry for a content hash if it is still reusable.
+
+        The file is checked to still be active on the server, since it may have
+        been deleted early; if not, its entry is dropped.
+        """
+        key = self._manifest_key(content_hash)
+        with self._manifest_lock:
+            entry = self._load_manifest().get(key)
+        if not entry or time.time() - entry.get("uploaded_at", 0) >= self.UPLOAD_REUSE_SECONDS:
+            return None
+        if self._file_is_active(entry["file_name"]):
+            return entry
+
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest.pop(key, None)
+            self._save_manifest(manifest)
+        return None
+
+    def _record_manifest(self, content_hash: str, file_uri: str, file_name: str):
+        """Record a completed upload in the manifest."""
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest[self._manifest_key(content_hash)] = {
+                "file_uri": file_uri,
+                "file_name": file_name,
+                "uploaded_at": time.time(),
+            }
+            self._save_manifest(manifest)
+
+    def _file_is_active(self, file_name: str) -> bool:
+        """Check whether an uploaded file still exists and is active."""
+        file_id = file_name.replace("files/", "") if file_name.startswith("files/") else file_name
+        try:
+            response = self.session.get(f"{self.FILES_URL}/{file_id}?key={self.api_key}")
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == 200 and response.json().get("state") == "ACTIVE"
+
+    def list_files(self) -> Dict[str, dict]:
+        """
+        List uploaded files that are active or still processing.
+
+        Returns:
+            Dict mapping display name to the file's metadata. If several files
+            share a display name, the first one listed is kept.
+        """
+        files = {}
+        page_token = None
+
+        while True:
+            url = f"{self.FILES_URL}?pageSize=100&key={self.api_key}"
+            if page_token:
+                url += f"&pageToken={page_token}"
+
+            response = self.session.get(url)
+            if response.status_code != 200:
+                raise Exception(f"Failed to list files: {response.status_code} {response.text}")
+
+            result = response.json()
+            for f in result.get("files", []):
+                if f.get("state") in ("ACTIVE", "PROCESSING"):
+                    files.setdefault(f.get("displayName"), f)
+
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return files
+
+    def _find_existing_file(self, display_name: str) -> Optional[dict]:
+        """Find an uploaded file with the given display name that is active or still processing."""
+        try:
+            return self.list_files().get(display_name)
+        except Exception:
+            return None
 
     def check_existing_file(self, display_name: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -47,14 +212,9 @@ class GeminiAPI:
         Returns:
             Tuple of (file_uri, file_name) if found, (None, None) otherwise.
         """
-        response = requests.get(f"{self.FILES_URL}?key={self.api_key}")
-        if response.status_code == 200:
-            files = response.json().get("files", [])
-            for f in files:
-                if f.get("displayName") == display_name:
-                    state = f.get("state")
-                    if state == "ACTIVE":
-                        return f.get("uri"), f.get("name")
+        f = self._find_existing_file(display_name)
+        if f and f.get("state") == "ACTIVE":
+            return f.get("uri"), f.get("name")
         return None, None
 
     def upload_file(
@@ -62,7 +222,8 @@ class GeminiAPI:
         filepath: Path,
         mime_type: str = "audio/wav",
         reuse_existing: bool = True,
-        verbose: bool = True
+        verbose: bool = True,
+        existing_files: Optional[Dict[str, dict]] = None
     ) -> Tuple[str, str]:
         """
         Upload a file to Gemini using the resumable upload API.
@@ -72,6 +233,8 @@ class GeminiAPI:
             mime_type: MIME type of the file.
             reuse_existing: If True, reuse existing upload with same name.
             verbose: If True, print progress messages.
+            existing_files: Optional result of list_files() to search for an existing
+                           upload, instead of listing files again for this call.
 
         Returns:
             Tuple of (file_uri, file_name).
@@ -80,13 +243,34 @@ class GeminiAPI:
         file_size = filepath.stat().st_size
         display_name = filepath.stem
 
-        # Check if file already exists
+        # Check the local manifest first: a content-hash match needs only a status check
+        content_hash = None
+        if reuse_existing and self.manifest_path:
+            content_hash = self._file_hash(filepath)
+            entry = self._lookup_manifest(content_hash)
+            if entry:
+                if verbose:
+                    print(f"    Using existing upload: {entry['file_name']}")
+                return entry["file_uri"], entry["file_name"]
+
+        # Fall back to searching uploaded files by name
         if reuse_existing:
-            existing_uri, existing_name = self.check_existing_file(display_name)
-            if existing_uri:
+            if existing_files is not None:
+                existing = existing_files.get(display_name)
+            else:
+                existing = self._find_existing_file(display_name)
+            if existing:
                 if verbose:
-                    print(f"    Using existing upload: {existing_name}")
-                return existing_uri, existing_name
+                    print(f"    Using existing upload: {existing.get('name')}")
+                # An upload that is still processing is reused rather than re-uploaded,
+                # unless its processing fails, in which case upload afresh below
+                try:
+                    if existing.get("state") != "ACTIVE":
+                        self._wait_for_file_processing(existing.get("name"), verbose)
+                    return existing.get("uri"), existing.get("name")
+                except Exception as e:
+                    if verbose:
+                        print(f"    Existing upload unusable ({e}), uploading again")
 
         if verbose:
             print(f"    Uploading {filepath.name} ({file_size / (1024*1024):.1f} MB)...")
@@ -102,7 +286,7 @@ class GeminiAPI:
 
         metadata = {"file": {"display_name": display_name}}
 
-        response = requests.post(
+        response = self.session.post(
             f"{self.UPLOAD_URL}?key={self.api_key}",
             headers=headers,
             json=metadata
@@ -115,36 +299,82 @@ class GeminiAPI:
         if not upload_url:
             raise Exception("No upload URL returned")
 
-        # Upload the file data
-        with open(filepath, 'rb') as f:
-            file_data = f.read()
+        response = self._upload_data(upload_url, filepath, file_size, verbose)
 
-        headers = {
-            "X-Goog-Upload-Command": "upload, finalize",
-            "X-Goog-Upload-Offset": "0",
-            "Content-Length": str(file_size),
-        }
+        file_info = response.json().get("file", {})
+        file_uri = file_info.get("uri")
+        file_name = file_info.get("name")
 
-        response = requests.post(upload_url, headers=headers, data=file_data)
+        # Wait for processing, unless the file was already active on upload
+        if file_info.get("state") != "ACTIVE":
+            self._wait_for_file_processing(file_name, verbose)
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to upload file: {response.status_code} {response.text}")
+        if content_hash:
+            self._record_manifest(content_hash, file_uri, file_name)
 
-        file_info = response.json()
-        file_uri = file_info.get("file", {}).get("uri")
-        file_name = file_info.get("file", {}).get("name")
+        return file_uri, file_name
 
-        # Wait for processing
-        self._wait_for_file_processing(file_name, verbose)
+    def _upload_data(self, upload_url: str, filepath: Path, file_size: int, verbose: bool = True):
+        """
+        Send a file's bytes to a resumable upload session, UPLOAD_CHUNK_SIZE at a time.
 
-        return file_uri, file_name
+        If a piece fails, the session is queried for how much the server received
+        and the upload resumes from there, instead of restarting the whole file.
+        """
+        offset = 0
+        failures = 0
+
+        with open(filepath, 'rb') as f:
+            while True:
+                length = min(self.UPLOAD_CHUNK_SIZE, file_size - offset)
+                final = offset + length >= file_size
+                f.seek(offset)
+                headers = {
+                    "X-Goog-Upload-Command": "upload, finalize" if final else "upload",
+                    "X-Goog-Upload-Offset": str(offset),
+                    "Content-Length": str(length),
+                }
+
+                try:
+                    response = self.session.post(upload_url, headers=headers, data=f.read(length))
+                    if response.status_code < 500:
+                        if response.status_code != 200:
+                            raise Exception(f"Failed to upload file: {response.status_code} {response.text}")
+                        if final:
+                            return response
+                        offset += length
+                        continue
+                    error = f"{response.status_code} {response.text}"
+                except requests.exceptions.RequestException as e:
+                    error = str(e)
+
+                failures += 1
+                if failures > self.UPLOAD_RETRIES:
+                    raise Exception(f"Failed to upload file: {error}")
+                if verbose:
+                    print(f"      Upload interrupted ({error}), resuming...")
+
+                response = self.session.post(upload_url, headers={"X-Goog-Upload-Command": "query"})
+                if response.status_code != 200:
+                    raise Exception(f"Failed to query upload status: {response.status_code} {response.text}")
+                # If only the response to the finalize was lost, the session is already
+                # complete and this response carries the file resource
+                if response.headers.get("X-Goog-Upload-Status") == "final":
+                    return response
+                offset = int(response.headers.get("X-Goog-Upload-Size-Received", 0))
 
     def _wait_for_file_processing(self, file_name: str, verbose: bool = True):
-        """Wait for an uploaded file to finish processing."""
+        """
+        Wait for an uploaded file to finish processing.
+
+        Checks immediately, then polls with jittered exponential backoff so small
+        files return quickly and parallel uploads don't poll in lockstep.
+        """
         file_id = file_name.replace("files/", "") if file_name.startswith("files/") else file_name
+        delay = 0.25
 
         while True:
-            response = requests.get(f"{self.FILES_URL}/{file_id}?key={self.api_key}")
+            response = self.session.get(f"{self.FILES_URL}/{file_id}?key={self.api_key}")
             if response.status_code != 200:
                 raise Exception(f"Failed to check file status: {response.status_code}")
 
@@ -156,38 +386,135 @@ class GeminiAPI:
 
             if verbose:
                 print(f"      Processing... (state: {state})")
-            time.sleep(3)
+            time.sleep(delay + random.uniform(0, delay * 0.2))
+            delay = min(delay * 1.7, 10.0)
 
-    def generate(
+    def _post_json(
         self,
-        prompt: str,
-        file_uri: Optional[str] = None,
-        mime_type: str = "audio/wav",
-        temperature: float = 0.2,
-        max_output_tokens: int = 30000,
-        timeout: int = 600
+        url: str,
+        payload: dict,
+        timeout: Optional[int] = None,
+        stream: bool = False
+    ) -> requests.Response:
+        """
+        POST a JSON payload, gzip-compressing bodies larger than GZIP_MIN_BYTES.
+
+        Strings longer than STREAM_ESCAPE_CHARS (e.g. the merge transcript) are
+        JSON-escaped and compressed a slice at a time, so no full-size escaped
+        copy of them is ever built. The bytes sent match json.dumps(payload).
+        """
+        headers = {"Content-Type": "application/json"}
+        large = {}
+        skeleton = json.dumps(self._extract_large_strings(payload, large))
+
+        if not large:
+            body = skeleton.encode("utf-8")
+            if len(body) > self.GZIP_MIN_BYTES:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            return self.session.post(url, headers=headers, data=body, timeout=timeout, stream=stream)
+
+        # Any large string puts the body over the gzip threshold
+        compressor = zlib.compressobj(wbits=31)  # gzip container
+        compressed = []
+        pattern = "|".join(re.escape(json.dumps(token)) for token in large)
+        for i, segment in enumerate(re.split(f"({pattern})", skeleton)):
+            if i % 2 == 0:
+                compressed.append(compressor.compress(segment.encode("utf-8")))
+                continue
+
+            text = large[json.loads(segment)]
+            compressed.append(compressor.compress(b'"'))
+            for start in range(0, len(text), self.STREAM_ESCAPE_CHARS):
+                escaped = encode_basestring_ascii(text[start:start + self.STREAM_ESCAPE_CHARS])
+                compressed.append(compressor.compress(escaped[1:-1].encode("ascii")))
+            compressed.append(compressor.compress(b'"'))
+
+        compressed.append(compressor.flush())
+        headers["Content-Encoding"] = "gzip"
+        body = b"".join(compressed)
+
+        return self.session.post(url, headers=headers, data=body, timeout=timeout, stream=stream)
+
+    def _extract_large_strings(self, obj, large: Dict[str, str]):
+        """Copy a JSON-able object, swapping long strings for unique tokens recorded in large."""
+        if isinstance(obj, str) and len(obj) > self.STREAM_ESCAPE_CHARS:
+            token = f"__LARGE_STRING_{secrets.token_hex(16)}__"
+            large[token] = obj
+            return token
+        if isinstance(obj, dict):
+            return {k: self._extract_large_strings(v, large) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._extract_large_strings(v, large) for v in obj]
+        return obj
+
+    def create_cache(
+        self,
+        system_instruction: Optional[str] = None,
+        ttl: str = "3600s",
+        contents: Optional[str] = None,
+        display_name: Optional[str] = None
     ) -> str:
         """
-        Generate content using Gemini.
+        Create an explicit context cache holding a system instruction and/or contents.
 
         Args:
-            prompt: The text prompt.
-            file_uri: Optional URI of an uploaded file to include.
-            mime_type: MIME type of the file (if file_uri provided).
-            temperature: Generation temperature.
-            max_output_tokens: Maximum tokens in response.
-            timeout: Request timeout in seconds.
+            system_instruction: Optional instruction text to cache.
+            ttl: Time-to-live of the cache, e.g. "3600s".
+            contents: Optional user content text to cache, e.g. a long document.
+            display_name: Optional human-readable name for the cache.
 
         Returns:
-            Generated text response.
+            The cache name, to be passed to generate() as cached_content.
         """
-        parts = []
+        payload = {
+            "model": f"models/{self.model}",
+            "ttl": ttl,
+        }
+
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        if contents:
+            payload["contents"] = [{"role": "user", "parts": [{"text": contents}]}]
+
+        if display_name:
+            payload["displayName"] = display_name
+
+        response = self._post_json(f"{self.CACHES_URL}?key={self.api_key}", payload)
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to create cache: {response.status_code} {response.text}")
+
+        return response.json()["name"]
+
+    def delete_cache(self, cache_name: str):
+        """Delete an explicit context cache created by create_cache()."""
+        cache_id = cache_name.replace("cachedContents/", "") if cache_name.startswith("cachedContents/") else cache_name
+        response = self.session.delete(f"{self.CACHES_URL}/{cache_id}?key={self.api_key}")
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to delete cache: {response.status_code} {response.text}")
+
+    def _generate_payload(
+        self,
+        prompt: Union[str, List[str]],
+        file_uri: Optional[str],
+        mime_type: str,
+        temperature: float,
+        max_output_tokens: int,
+        cached_content: Optional[str],
+        system_instruction: Optional[str]
+    ) -> dict:
+        """Build the request payload shared by generate() and generate_stream()."""
+        # Text goes before the file so that requests sharing a prompt also share a
+        # prefix, which is what Gemini's implicit caching keys on.
+        texts = [prompt] if isinstance(prompt, str) else prompt
+        parts = [{"text": text} for text in texts if text]
 
         if file_uri:
             parts.append({"file_data": {"mime_type": mime_type, "file_uri": file_uri}})
 
-        parts.append({"text": prompt})
-
         payload = {
             "contents": [{"parts": parts}],
             "generationConfig": {
@@ -196,13 +523,49 @@ class GeminiAPI:
             }
         }
 
-        response = requests.post(
-            f"{self.generate_url}?key={self.api_key}",
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=timeout
+        if system_instruction:
+            payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+
+        if cached_content:
+            payload["cachedContent"] = cached_content
+
+        return payload
+
+    def generate(
+        self,
+        prompt: Union[str, List[str]],
+        file_uri: Optional[str] = None,
+        mime_type: str = "audio/wav",
+        temperature: float = 0.2,
+        max_output_tokens: int = 30000,
+        timeout: int = 600,
+        cached_content: Optional[str] = None,
+        system_instruction: Optional[str] = None
+    ) -> str:
+        """
+        Generate content using Gemini.
+
+        Args:
+            prompt: The text prompt, or a list of texts sent as consecutive parts.
+                    May be empty when cached_content holds the instructions.
+            file_uri: Optional URI of an uploaded file to include.
+            mime_type: MIME type of the file (if file_uri provided).
+            temperature: Generation temperature.
+            max_output_tokens: Maximum tokens in response.
+            timeout: Request timeout in seconds.
+            cached_content: Optional cache name from create_cache() to use as a prefix.
+            system_instruction: Optional static instructions, sent ahead of the contents.
+
+        Returns:
+            Generated text response.
+        """
+        payload = self._generate_payload(
+            prompt, file_uri, mime_type, temperature, max_output_tokens,
+            cached_content, system_instruction
         )
 
+        response = self._post_json(f"{self.generate_url}?key={self.api_key}", payload, timeout)
+
         if response.status_code != 200:
             raise Exception(f"Generation failed: {response.status_code} {response.text}")
 
@@ -213,3 +576,123 @@ class GeminiAPI:
         except (KeyError, IndexError) as e:
             print(f"Response: {json.dumps(result, indent=2)[:2000]}")
             raise Exception(f"Failed to extract response: {e}")
+
+    def generate_stream(
+        self,
+        prompt: Union[str, List[str]],
+        file_uri: Optional[str] = None,
+        mime_type: str = "audio/wav",
+        temperature: float = 0.2,
+        max_output_tokens: int = 30000,
+        timeout: int = 600,
+        cached_content: Optional[str] = None,
+        system_instruction: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate content using Gemini, yielding text as it is produced.
+
+        Takes the same arguments as generate(), but uses the server-sent events
+        variant of the endpoint so callers can consume the response incrementally.
+
+        Yields:
+            Successive pieces of the generated text.
+        """
+        payload = self._generate_payload(
+            prompt, file_uri, mime_type, temperature, max_output_tokens,
+            cached_content, system_instruction
+        )
+
+        response = self._post_json(
+            f"{self.stream_generate_url}?alt=sse&key={self.api_key}", payload, timeout, stream=True
+        )
+
+        return self._iter_stream_text(response)
+
+    def prepare_template(
+        self,
+        prompt: Union[str, List[str]] = "",
+        mime_type: str = "audio/wav",
+        temperature: float = 0.2,
+        max_output_tokens: int = 30000,
+        cached_content: Optional[str] = None,
+        system_instruction: Optional[str] = None
+    ) -> bytes:
+        """
+        Serialize a generation request once, leaving a placeholder for the file URI.
+
+        For runs that send the same request with a different file each time, pass
+        the result to generate_stream_from_template() instead of rebuilding and
+        re-serializing the payload per call.
+
+        Returns:
+            The encoded JSON request body, with a placeholder for the file URI.
+        """
+        payload = self._generate_payload(
+            prompt, self._file_uri_placeholder, mime_type, temperature, max_output_tokens,
+            cached_content, system_instruction
+        )
+        return json.dumps(payload).encode("utf-8")
+
+    def generate_stream_from_template(
+        self,
+        template: bytes,
+        file_uri: str,
+        timeout: int = 600
+    ) -> Iterator[str]:
+        """
+        Like generate_stream(), but for a request body built by prepare_template().
+
+        Yields:
+            Successive pieces of the generated text.
+        """
+        body = template.replace(
+            self._file_uri_placeholder.encode(), json.dumps(file_uri)[1:-1].encode()
+        )
+
+        response = self.session.post(
+            f"{self.stream_generate_url}?alt=sse&key={self.api_key}",
+            headers={"Content-Type": "application/json"},
+            data=body,
+            timeout=timeout,
+            stream=True
+        )
+
+        return self._iter_stream_text(response)
+
+    def _iter_stream_text(self, response: requests.Response) -> Iterator[str]:
+        """
+        Yield the text deltas from a server-sent events generation response.
+
+        Errors after the HTTP 200 arrive as events in the stream, so those raise,
+        as does a stream that ends without a STOP or MAX_TOKENS finish reason.
+        The generator only completes normally for a finished response.
+        """
+        with response:
+            if response.status_code != 200:
+                raise Exception(f"Generation failed: {response.status_code} {response.text}")
+
+            produced_text = False
+            finish_reason = None
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+
+                event = json.loads(line[len(b"data:"):])
+                if "error" in event:
+                    raise Exception(f"Generation failed: {json.dumps(event['error'])}")
+
+                candidates = event.get("candidates") or [{}]
+                for part in candidates[0].get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        produced_text = True
+                        yield part["text"]
+                finish_reason = candidates[0].get("finishReason") or finish_reason
+
+            if finish_reason is None:
+                raise Exception("Generation stream ended before the response was finished")
+            if finish_reason == "MAX_TOKENS":
+                print("Warning: response was cut off at the maximum output length")
+            elif finish_reason != "STOP":
+                raise Exception(f"Generation stopped early: {finish_reason}")
+            if not produced_text:
+                raise Exception("Failed to extract response: no text in stream")
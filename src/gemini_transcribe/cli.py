@@ -95,6 +95,13 @@ Environment Variables:
         help="Directory to store audio chunks (default: audio_chunks)"
     )
 
+    parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=4,
+        help="Number of chunks to transcribe in parallel (default: 4)"
+    )
+
     parser.add_argument(
         "-q", "--quiet",
         action="store_true",
@@ -125,6 +132,7 @@ Environment Variables:
             chunk_duration=args.chunk_duration,
             overlap=args.overlap,
             chunks_dir=args.chunks_dir,
+            concurrency=args.concurrency,
             verbose=not args.quiet
         )
 
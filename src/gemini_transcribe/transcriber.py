@@ -3,10 +3,16 @@ Main transcriber class for chunked audio transcription.
 """
 
 import hashlib
+import io
+import json
 import os
 import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
 
 from .api import GeminiAPI
 
@@ -37,6 +43,51 @@ Provide the complete transcript for this segment."""
 DEFAULT_CHUNK_PROMPT = get_chunk_prompt()
 
 
+def _pcm_wav_duration(filepath: Path) -> Optional[float]:
+    """
+    Get the duration of an uncompressed PCM WAV from its header.
+
+    Returns None if the wave module can't read the file, or if the header's data
+    size is unusable: crashed recorders and ffmpeg writing to a pipe leave it as
+    0 or 0xFFFFFFFF, so it must be non-zero and fit within the actual file.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            with wave.open(f, "rb") as w:
+                # wave.open stops reading at the start of the sample data
+                available = os.fstat(f.fileno()).st_size - f.tell()
+                data_size = w.getnframes() * w.getsampwidth() * w.getnchannels()
+                if data_size == 0 or data_size > available:
+                    return None
+                return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return None
+
+
+def _is_pcm_wav(filepath: Path) -> bool:
+    """Check whether a file is an uncompressed PCM WAV that can be sliced without ffmpeg."""
+    return _pcm_wav_duration(filepath) is not None
+
+
+def _slice_wav_pcm(src_path: Path, start_sec: float, dur_sec: float, dst_path: Path):
+    """Copy a time range of a PCM WAV file into a new WAV file, without decoding."""
+    with wave.open(str(src_path), "rb") as src:
+        total_frames = src.getnframes()
+        start_frame = min(int(start_sec * src.getframerate()), total_frames)
+        remaining = min(int(dur_sec * src.getframerate()), total_frames - start_frame)
+        src.setpos(start_frame)
+
+        with wave.open(str(dst_path), "wb") as dst:
+            dst.setparams(src.getparams())
+            dst.setnframes(remaining)
+            while remaining > 0:
+                frames = src.readframes(min(remaining, 1 << 16))
+                if not frames:
+                    break
+                dst.writeframes(frames)
+                remaining -= len(frames) // (src.getsampwidth() * src.getnchannels())
+
+
 DEFAULT_MERGE_PROMPT = """Below is a transcript assembled from multiple audio chunks. Please:
 
 1. Clean up any duplicate text at chunk boundaries (there was overlap between chunks)
@@ -58,6 +109,34 @@ Here is the raw transcript to clean up:
 Please output the cleaned, formatted transcript with section headers."""
 
 
+def _write_stream(pieces: Iterator[str], output_file: Optional[Path] = None, preamble: str = "") -> str:
+    """
+    Collect streamed text, writing it to output_file as it arrives if given.
+
+    Text goes to a temporary ".part" file that is renamed into place only once
+    the stream finishes without error, so a failed or cut-off generation never
+    leaves a truncated file that a later run would take as complete.
+    """
+    if output_file is None:
+        return "".join(pieces)
+
+    collected = []
+    part_file = Path(f"{output_file}.part")
+    try:
+        with open(part_file, 'w', encoding='utf-8') as f:
+            f.write(preamble)
+            for piece in pieces:
+                f.write(piece)
+                f.flush()
+                collected.append(piece)
+    except BaseException:
+        part_file.unlink(missing_ok=True)
+        raise
+    os.replace(part_file, output_file)
+
+    return "".join(collected)
+
+
 class Transcriber:
     """
     Transcribe long audio files by splitting into chunks.
@@ -66,6 +145,9 @@ class Transcriber:
     by processing shorter segments independently, then merging them.
     """
 
+    # Lifetime in seconds of the explicit cache holding the combined transcript
+    MERGE_CACHE_TTL = 3600
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -73,6 +155,7 @@ class Transcriber:
         chunk_duration: int = 20 * 60,  # 20 minutes in seconds
         overlap: int = 10,  # 10 seconds overlap
         chunks_dir: str = "audio_chunks",
+        concurrency: int = 4,
         verbose: bool = True
     ):
         """
@@ -84,13 +167,23 @@ class Transcriber:
             chunk_duration: Duration of each chunk in seconds (default: 20 minutes).
             overlap: Overlap between chunks in seconds (default: 10 seconds).
             chunks_dir: Directory to store audio chunks.
+            concurrency: Number of chunks to upload and transcribe in parallel.
             verbose: Whether to print progress messages.
         """
-        self.api = GeminiAPI(api_key=api_key, model=model)
         self.chunk_duration = chunk_duration
         self.overlap = overlap
         self.chunks_dir = Path(chunks_dir)
+        self.concurrency = max(1, concurrency)
+        # Size the connection pool so every worker thread keeps its own
+        # keep-alive connection, rather than opening and discarding extras
+        self.api = GeminiAPI(
+            api_key=api_key,
+            model=model,
+            pool_maxsize=max(16, 2 * self.concurrency),
+            manifest_path=self.chunks_dir / "manifest.json"
+        )
         self.verbose = verbose
+        self._duration_cache = {}
 
     def _log(self, message: str):
         """Print message if verbose mode is on."""
@@ -98,7 +191,24 @@ class Transcriber:
             print(message)
 
     def get_audio_duration(self, filepath: Path) -> float:
-        """Get audio duration in seconds using ffprobe."""
+        """
+        Get audio duration in seconds.
+
+        PCM WAV durations are read from the header; other formats use ffprobe.
+        Results are cached per file path, modification time and size.
+        """
+        stat = os.stat(filepath)
+        cache_key = (str(Path(filepath).resolve()), stat.st_mtime_ns, stat.st_size)
+        if cache_key not in self._duration_cache:
+            self._duration_cache[cache_key] = self._probe_audio_duration(filepath)
+        return self._duration_cache[cache_key]
+
+    def _probe_audio_duration(self, filepath: Path) -> float:
+        """Read audio duration from the WAV header, falling back to ffprobe."""
+        duration = _pcm_wav_duration(filepath)
+        if duration is not None:
+            return duration
+
         cmd = [
             "ffprobe", "-v", "error", "-show_entries", "format=duration",
             "-of", "default=noprint_wrappers=1:nokey=1", str(filepath)
@@ -108,16 +218,33 @@ class Transcriber:
             raise Exception(f"ffprobe failed: {result.stderr}")
         return float(result.stdout.strip())
 
-    def split_audio(self, filepath: Path, cache_prefix: str) -> List[Dict[str, Any]]:
+    def _chunk_bounds(self, duration: float) -> List[Tuple[float, float]]:
+        """Compute (start, end) times of each chunk, accounting for overlap."""
+        bounds = []
+        start = 0
+
+        while start < duration:
+            end = min(start + self.chunk_duration, duration)
+            bounds.append((start, end))
+
+            if end >= duration:
+                break
+
+            # Move start, accounting for overlap
+            start = end - self.overlap
+
+        return bounds
+
+    def iter_chunks(self, filepath: Path, cache_prefix: str) -> Iterator[Dict[str, Any]]:
         """
-        Split audio file into chunks with overlap.
+        Split audio file into chunks with overlap, yielding each chunk as soon as it is written.
 
         Args:
             filepath: Path to the audio file.
             cache_prefix: Unique prefix for chunk files (includes path hash).
 
-        Returns:
-            List of chunk dictionaries with 'file', 'start', 'end', 'num' keys.
+        Yields:
+            Chunk dictionaries with 'file', 'start', 'end', 'num', 'total' keys.
         """
         self.chunks_dir.mkdir(exist_ok=True)
         filepath = Path(filepath)
@@ -125,86 +252,328 @@ class Transcriber:
         duration = self.get_audio_duration(filepath)
         self._log(f"Total audio duration: {duration/60:.1f} minutes")
 
-        chunks = []
-        start = 0
-        chunk_num = 1
+        bounds = self._chunk_bounds(duration)
 
-        while start < duration:
-            end = min(start + self.chunk_duration, duration)
-            chunk_file = self.chunks_dir / f"{cache_prefix}_chunk_{chunk_num:02d}.wav"
-
-            # Use ffmpeg to extract chunk
+        # PCM WAV chunks are plain byte ranges, so they are sliced without ffmpeg.
+        # Otherwise, without overlap the chunks are contiguous and ffmpeg's segment
+        # muxer can cut them all in a single pass over the input.
+        pcm = _is_pcm_wav(filepath)
+        segmented = not pcm and self.overlap == 0 and len(bounds) > 1
+        if segmented:
             cmd = [
                 "ffmpeg", "-y", "-i", str(filepath),
-                "-ss", str(start), "-t", str(self.chunk_duration),
-                "-acodec", "copy", str(chunk_file)
+                "-f", "segment", "-segment_time", str(self.chunk_duration),
+                "-segment_start_number", "1", "-reset_timestamps", "1",
+                "-acodec", "copy",
+                str(self.chunks_dir / f"{cache_prefix.replace('%', '%%')}_chunk_%02d.wav")
             ]
             result = subprocess.run(cmd, capture_output=True)
             if result.returncode != 0:
                 raise Exception(f"ffmpeg failed: {result.stderr.decode()}")
 
-            chunks.append({
-                "file": chunk_file,
-                "start": start,
-                "end": end,
-                "num": chunk_num
-            })
+        chunk_files = [
+            self.chunks_dir / f"{cache_prefix}_chunk_{chunk_num:02d}.wav"
+            for chunk_num in range(1, len(bounds) + 1)
+        ]
 
-            self._log(f"  Created chunk {chunk_num}: {start/60:.1f}m - {end/60:.1f}m")
+        # With overlap, extract chunks in parallel: stream-copying is I/O-bound, so
+        # several ffmpeg processes can run at once
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            futures = [] if segmented else [
+                executor.submit(self._extract_chunk, filepath, start, chunk_file, pcm)
+                for (start, end), chunk_file in zip(bounds, chunk_files)
+            ]
 
-            # Move start, accounting for overlap
-            start = end - self.overlap
-            chunk_num += 1
+            for i, ((start, end), chunk_file) in enumerate(zip(bounds, chunk_files)):
+                if segmented:
+                    if not chunk_file.exists():
+                        raise Exception(f"ffmpeg did not produce expected chunk {chunk_file}")
+                else:
+                    futures[i].result()
+
+                self._log(f"  Created chunk {i + 1}: {start/60:.1f}m - {end/60:.1f}m")
+
+                yield {
+                    "file": chunk_file,
+                    "start": start,
+                    "end": end,
+                    "num": i + 1,
+                    "total": len(bounds)
+                }
+
+        self._log(f"Created {len(bounds)} chunks")
+
+    def _extract_chunk(self, filepath: Path, start: float, chunk_file: Path, pcm: bool = False):
+        """Extract one chunk starting at start seconds, slicing directly if the input is PCM WAV."""
+        if pcm:
+            _slice_wav_pcm(filepath, start, self.chunk_duration, chunk_file)
+            return
+
+        # -ss before -i seeks in the input instead of reading and discarding
+        # everything before start
+        cmd = [
+            "ffmpeg", "-y", "-ss", str(start), "-i", str(filepath),
+            "-t", str(self.chunk_duration),
+            "-acodec", "copy", str(chunk_file)
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg failed: {result.stderr.decode()}")
 
-            if end >= duration:
-                break
+    def split_audio(self, filepath: Path, cache_prefix: str) -> List[Dict[str, Any]]:
+        """
+        Split audio file into chunks with overlap.
+
+        Args:
+            filepath: Path to the audio file.
+            cache_prefix: Unique prefix for chunk files (includes path hash).
+
+        Returns:
+            List of chunk dictionaries with 'file', 'start', 'end', 'num', 'total' keys.
+        """
+        return list(self.iter_chunks(filepath, cache_prefix))
+
+    def _process_chunk(
+        self,
+        chunk: Dict[str, Any],
+        transcripts_dir: Path,
+        existing_transcripts: Set[str],
+        run: Dict[str, Any]
+    ) -> str:
+        """
+        Load an existing chunk transcript, or upload and transcribe the chunk.
+
+        run holds the chunk prompt and the per-run setup from _prepare_run, which
+        is only done once some chunk actually needs transcribing.
+        """
+        total_chunks = chunk["total"]
+        chunk_transcript_name = f"chunk_{chunk['num']:02d}.md"
+        chunk_transcript_file = transcripts_dir / chunk_transcript_name
+
+        # Check if we already have this chunk transcribed
+        if chunk_transcript_name in existing_transcripts:
+            self._log(f"\nChunk {chunk['num']}/{total_chunks}: Loading existing from {chunk_transcript_file}")
+            with open(chunk_transcript_file, 'r', encoding='utf-8') as f:
+                transcript = f.read()
+            self._log(f"    Loaded {len(transcript):,} chars")
+            return transcript
+
+        self._log(f"\nProcessing chunk {chunk['num']}/{total_chunks} "
+                  f"({chunk['start']/60:.0f}m - {chunk['end']/60:.0f}m):")
+
+        self._prepare_run(run)
+        file_uri, file_name = self.api.upload_file(
+            chunk["file"], verbose=self.verbose, existing_files=run["existing_files"]
+        )
+        # The transcript is saved to disk as it streams in
+        transcript = self.transcribe_chunk(
+            file_uri, chunk["num"], total_chunks, run["chunk_prompt"], run["cache_name"],
+            output_file=chunk_transcript_file, template=run["template"]
+        )
+        self._log(f"    Saved chunk {chunk['num']} transcript ({len(transcript):,} chars)")
+
+        return transcript
 
-        self._log(f"Created {len(chunks)} chunks")
-        return chunks
+    def _prepare_run(self, run: Dict[str, Any]):
+        """
+        Set up what chunk transcription needs, the first time a chunk needs it.
+
+        Creates the prompt cache, serializes the request template and lists
+        previous uploads, storing them in run. Runs once, however many workers
+        call it, and not at all when every chunk is already transcribed.
+        """
+        with run["lock"]:
+            if "template" in run:
+                return
+            chunk_prompt = run["chunk_prompt"]
+
+            # Cache the chunk prompt once for the whole run instead of resending it with
+            # every chunk; prompts below the explicit-cache floor are sent inline.
+            if "cache_name" not in run:
+                run["cache_name"] = None
+                if len(chunk_prompt) // 4 >= GeminiAPI.MIN_CACHE_TOKENS:
+                    try:
+                        run["cache_name"] = self.api.create_cache(chunk_prompt, ttl="10800s")
+                        self._log(f"Cached chunk prompt as {run['cache_name']}")
+                    except Exception as e:
+                        self._log(f"Could not cache chunk prompt, sending it inline: {e}")
+
+            # List previous uploads once for the whole run, rather than once per chunk
+            try:
+                run["existing_files"] = self.api.list_files()
+            except Exception as e:
+                self._log(f"Could not list existing uploads, uploading all chunks: {e}")
+                run["existing_files"] = {}
+
+            # Every chunk request is identical apart from the file URI, so serialize it once
+            run["template"] = self.prepare_chunk_template(chunk_prompt, run["cache_name"])
 
     def transcribe_chunk(
         self,
         file_uri: str,
         chunk_num: int,
         total_chunks: int,
-        prompt: str
+        prompt: str,
+        cached_content: Optional[str] = None,
+        output_file: Optional[Path] = None,
+        template: Optional[bytes] = None
     ) -> str:
-        """Transcribe a single audio chunk."""
+        """
+        Transcribe a single audio chunk.
+
+        The prompt is identical for every chunk, so it is sent as the system
+        instruction (or taken from cached_content if given) to keep it at a
+        stable, cacheable prefix ahead of the per-chunk audio. If output_file is
+        given, the transcript is written to it as it streams in. If template is
+        given (from prepare_chunk_template), it is sent instead of building the
+        request again.
+        """
         self._log(f"  Transcribing chunk {chunk_num}/{total_chunks}...")
 
-        return self.api.generate(
-            prompt=prompt,
-            file_uri=file_uri,
-            mime_type="audio/wav",
-            temperature=0.2,
-            max_output_tokens=30000,
-            timeout=600
-        )
+        if template is not None:
+            pieces = self.api.generate_stream_from_template(template, file_uri, timeout=600)
+        else:
+            pieces = self.api.generate_stream(
+                prompt="",
+                file_uri=file_uri,
+                timeout=600,
+                **self._chunk_generation_args(prompt, cached_content)
+            )
+        return _write_stream(pieces, output_file)
+
+    def _chunk_generation_args(self, prompt: str, cached_content: Optional[str] = None) -> Dict[str, Any]:
+        """Generation settings shared by every chunk transcription request."""
+        return {
+            "mime_type": "audio/wav",
+            "temperature": 0.2,
+            "max_output_tokens": 30000,
+            "cached_content": cached_content,
+            "system_instruction": None if cached_content else prompt,
+        }
+
+    def prepare_chunk_template(self, prompt: str, cached_content: Optional[str] = None) -> bytes:
+        """Serialize the chunk transcription request once per run, for use with transcribe_chunk."""
+        return self.api.prepare_template(**self._chunk_generation_args(prompt, cached_content))
+
+    def _merge_cache_key(self, combined: str) -> str:
+        """Key for the merge cache registry: a hash of the model and combined transcript."""
+        digest = hashlib.sha256(f"{self.api.model}\n".encode())
+        # Hash in slices rather than encoding another full-size copy of the transcript
+        for start in range(0, len(combined), 1 << 20):
+            digest.update(combined[start:start + (1 << 20)].encode())
+        return digest.hexdigest()[:16]
+
+    def _load_merge_registry(self) -> Dict[str, Dict[str, Any]]:
+        """Load the merge cache registry, or an empty one if missing or unreadable."""
+        try:
+            return json.loads((self.chunks_dir / "merge_caches.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_merge_registry(self, registry: Dict[str, Dict[str, Any]]):
+        """Write the merge cache registry, dropping entries that have expired."""
+        now = time.time()
+        registry = {k: v for k, v in registry.items() if v["expires_at"] > now}
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        (self.chunks_dir / "merge_caches.json").write_text(json.dumps(registry, indent=2))
+
+    def _get_merge_cache(self, combined: str) -> Optional[str]:
+        """
+        Get an explicit cache holding the combined chunk transcripts.
 
-    def merge_transcripts(self, transcripts: List[str], merge_prompt: str) -> str:
+        Cache names are persisted in chunks_dir by content hash, so re-running the
+        merge over the same chunks reuses the server-side cache until it expires.
+        """
+        key = self._merge_cache_key(combined)
+        registry = self._load_merge_registry()
+
+        entry = registry.get(key)
+        # Leave a margin so the cache can't expire between lookup and use
+        if entry and entry["expires_at"] - 300 > time.time():
+            self._log(f"Reusing cached transcript {entry['cache_name']}")
+            return entry["cache_name"]
+
+        try:
+            cache_name = self.api.create_cache(
+                contents=combined,
+                ttl=f"{self.MERGE_CACHE_TTL}s",
+                display_name=f"merge-{key}"
+            )
+        except Exception as e:
+            self._log(f"Could not cache combined transcript, sending it inline: {e}")
+            return None
+
+        registry[key] = {"cache_name": cache_name, "expires_at": time.time() + self.MERGE_CACHE_TTL}
+        self._save_merge_registry(registry)
+        self._log(f"Cached combined transcript as {cache_name}")
+        return cache_name
+
+    def _forget_merge_cache(self, combined: str):
+        """Remove the registry entry for a combined transcript whose cache is unusable."""
+        registry = self._load_merge_registry()
+        registry.pop(self._merge_cache_key(combined), None)
+        self._save_merge_registry(registry)
+
+    def merge_transcripts(
+        self,
+        transcripts: List[str],
+        merge_prompt: str,
+        output_file: Optional[str] = None,
+        header: Optional[str] = None
+    ) -> str:
         """
         Merge chunk transcripts with a final formatting pass.
 
         Args:
             transcripts: List of transcript strings from each chunk.
             merge_prompt: Prompt template for merging (must contain {transcript} placeholder).
+            output_file: Optional path to write the merged transcript to as it streams in.
+            header: Optional header text to write ahead of the transcript in output_file.
 
         Returns:
             Merged and formatted transcript.
         """
+        if "\0" not in merge_prompt.format(transcript="\0"):
+            raise ValueError("merge_prompt must contain a {transcript} placeholder")
+
         self._log("\nMerging and formatting final transcript...")
 
         # Combine all transcripts with chunk markers
-        combined = "\n\n---\n\n".join([
-            f"[Chunk {i+1}]\n\n{t}" for i, t in enumerate(transcripts)
-        ])
-
-        return self.api.generate(
-            prompt=merge_prompt.format(transcript=combined),
-            temperature=0.3,
-            max_output_tokens=100000,
-            timeout=900
-        )
+        buf = io.StringIO()
+        for i, t in enumerate(transcripts):
+            if i:
+                buf.write("\n\n---\n\n")
+            buf.write(f"[Chunk {i+1}]\n\n")
+            buf.write(t)
+        combined = buf.getvalue()
+        del buf
+
+        # Large transcripts go into an explicit cache, and the prompt refers to it
+        cache_name = None
+        if len(combined) // 4 >= GeminiAPI.MIN_CACHE_TOKENS:
+            cache_name = self._get_merge_cache(combined)
+
+        preamble = f"{header}\n\n---\n\n" if header else ""
+        generation_args = {"temperature": 0.3, "max_output_tokens": 100000, "timeout": 900}
+
+        if cache_name:
+            try:
+                pieces = self.api.generate_stream(
+                    prompt=merge_prompt.format(transcript="(The raw transcript is provided above.)"),
+                    cached_content=cache_name,
+                    **generation_args
+                )
+                return _write_stream(pieces, output_file, preamble)
+            except Exception as e:
+                # The server-side cache may be gone; don't keep reusing it
+                self._log(f"Merge with cached transcript failed, sending it inline: {e}")
+                self._forget_merge_cache(combined)
+
+        # Send the transcript as its own text part between the halves of the
+        # prompt, rather than formatting it into another copy of the string
+        before, after = merge_prompt.format(transcript="\0").split("\0", 1)
+        pieces = self.api.generate_stream(prompt=[before, combined, after], **generation_args)
+        return _write_stream(pieces, output_file, preamble)
 
     def transcribe(
         self,
@@ -263,49 +632,55 @@ class Transcriber:
         path_hash = hashlib.sha256(abs_path.encode()).hexdigest()[:12]
         cache_prefix = f"{audio_path.stem}_{path_hash}"
 
-        # Step 1: Split audio
-        self._log("Step 1: Splitting audio into chunks...")
-        chunks = self.split_audio(audio_path, cache_prefix)
-
-        # Step 2: Transcribe each chunk (or load existing)
-        self._log("\nStep 2: Loading/transcribing chunks...")
-        transcripts = []
-
-        for chunk in chunks:
-            chunk_transcript_file = f"{cache_prefix}_chunk_{chunk['num']:02d}.md"
-
-            # Check if we already have this chunk transcribed
-            if os.path.exists(chunk_transcript_file):
-                self._log(f"\nChunk {chunk['num']}/{len(chunks)}: Loading existing from {chunk_transcript_file}")
-                with open(chunk_transcript_file, 'r') as f:
-                    transcript = f.read()
-                self._log(f"    Loaded {len(transcript):,} chars")
-            else:
-                self._log(f"\nProcessing chunk {chunk['num']}/{len(chunks)} "
-                         f"({chunk['start']/60:.0f}m - {chunk['end']/60:.0f}m):")
-
-                file_uri, file_name = self.api.upload_file(chunk["file"])
-                transcript = self.transcribe_chunk(
-                    file_uri, chunk["num"], len(chunks), chunk_prompt
-                )
-
-                # Save intermediate progress
-                with open(chunk_transcript_file, 'w') as f:
-                    f.write(transcript)
-                self._log(f"    Saved chunk {chunk['num']} transcript ({len(transcript):,} chars)")
+        # Chunk transcripts live alongside the audio chunks, in a directory per
+        # input file. List it once up front to find chunks that are already done.
+        transcripts_dir = self.chunks_dir / cache_prefix
+        transcripts_dir.mkdir(parents=True, exist_ok=True)
+        existing_transcripts = {entry.name for entry in os.scandir(transcripts_dir)}
 
-            transcripts.append(transcript)
+        # Steps 1 & 2: Split audio, transcribing each chunk (or loading existing)
+        # as soon as ffmpeg has written it
+        self._log("Step 1: Splitting audio into chunks...")
+        self._log("Step 2: Loading/transcribing chunks as they are created...")
+
+        # The prompt cache, request template and upload listing are set up by the
+        # first chunk that needs transcribing, so a fully resumed run skips them
+        run = {"chunk_prompt": chunk_prompt, "lock": threading.Lock()}
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {}
+                try:
+                    for chunk in self.iter_chunks(audio_path, cache_prefix):
+                        future = executor.submit(
+                            self._process_chunk, chunk, transcripts_dir, existing_transcripts, run
+                        )
+                        futures[future] = chunk
+                    for future in as_completed(futures):
+                        results[futures[future]["num"]] = future.result()
+                        self._log(f"  Finished {len(results)}/{len(futures)} chunks")
+                except BaseException:
+                    # Don't start queued chunks after a failure or Ctrl-C; the
+                    # executor would otherwise run them all before re-raising
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            cache_name = run.get("cache_name")
+            if cache_name:
+                try:
+                    self.api.delete_cache(cache_name)
+                except Exception as e:
+                    self._log(f"Failed to delete prompt cache {cache_name}: {e}")
+
+        transcripts = [results[num] for num in sorted(results)]
 
         # Step 3: Merge and format
         self._log("\nStep 3: Merging and final formatting pass...")
-        final_transcript = self.merge_transcripts(transcripts, merge_prompt)
-
-        # Save final transcript
-        with open(output_file, 'w', encoding='utf-8') as f:
-            if header:
-                f.write(header)
-                f.write("\n\n---\n\n")
-            f.write(final_transcript)
+        final_transcript = self.merge_transcripts(
+            transcripts, merge_prompt, output_file=output_file, header=header
+        )
 
         self._log(f"\nFinal transcript saved to: {output_file}")
         self._log(f"Length: {len(final_transcript):,} characters")
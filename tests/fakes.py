@@ -0,0 +1,88 @@
+"""
+Offline stand-ins for requests.Session, used to test GeminiAPI without network access.
+"""
+
+import gzip
+import json
+
+from gemini_transcribe import GeminiAPI
+
+
+class FakeResponse:
+    """Minimal requests.Response look-alike."""
+
+    def __init__(self, status_code=200, json_data=None, headers=None, text="", lines=None):
+        self.status_code = status_code
+        self._json = json_data if json_data is not None else {}
+        self.headers = headers or {}
+        self.text = text
+        self._lines = lines or []
+
+    def json(self):
+        return self._json
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def sse(*events):
+    """Encode events as server-sent event lines."""
+    return [b"data: " + json.dumps(event).encode() for event in events]
+
+
+def text_event(text, finish_reason=None):
+    """A streamGenerateContent event carrying one text delta."""
+    candidate = {"content": {"parts": [{"text": text}]}}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {"candidates": [candidate]}
+
+
+def decode_body(call):
+    """Decode a recorded JSON request body, gunzipping it if needed."""
+    body = call["data"]
+    if call["headers"].get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+class FakeSession:
+    """
+    Records requests and answers them with a handler.
+
+    The handler receives the recorded call dict and returns a FakeResponse, or
+    raises to simulate a connection error.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+
+    def _request(self, method, url, headers=None, data=None, json=None, **kwargs):
+        if hasattr(data, "read"):
+            data = data.read()
+        call = {"method": method, "url": url, "headers": headers or {}, "data": data, "json": json}
+        self.calls.append(call)
+        return self.handler(call)
+
+    def get(self, url, **kwargs):
+        return self._request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._request("POST", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._request("DELETE", url, **kwargs)
+
+
+def make_api(handler):
+    """Create a GeminiAPI whose requests are answered by handler."""
+    api = GeminiAPI(api_key="test-key")
+    api.session = FakeSession(handler)
+    return api
@@ -0,0 +1,251 @@
+"""
+Tests for the GeminiAPI wrapper, run against a fake session.
+"""
+
+import gzip
+import hashlib
+import json
+
+import pytest
+import requests
+
+from gemini_transcribe import GeminiAPI
+
+from .fakes import FakeResponse, FakeSession, decode_body, make_api, sse, text_event
+
+
+def stream_ok(call):
+    return FakeResponse(lines=sse(text_event("hello "), text_event("world", "STOP")))
+
+
+def test_small_payloads_are_not_gzipped():
+    api = make_api(stream_ok)
+
+    api._post_json("https://example/x", {"a": "b"})
+
+    call = api.session.calls[0]
+    assert "Content-Encoding" not in call["headers"]
+    assert call["data"] == json.dumps({"a": "b"}).encode()
+
+
+def test_large_payloads_are_gzipped():
+    api = make_api(stream_ok)
+    payload = {"text": "x" * (api.GZIP_MIN_BYTES + 1)}
+
+    api._post_json("https://example/x", payload)
+
+    call = api.session.calls[0]
+    assert call["headers"]["Content-Encoding"] == "gzip"
+    assert decode_body(call) == payload
+
+
+def test_long_strings_are_escaped_in_slices():
+    api = make_api(stream_ok)
+    api.STREAM_ESCAPE_CHARS = 7
+    payload = {"parts": [{"text": 'a "quoted" \\ line\nwith ünïcode 😀 ' * 1000}, {"text": "short"}]}
+
+    api._post_json("https://example/x", payload)
+
+    call = api.session.calls[0]
+    assert call["headers"]["Content-Encoding"] == "gzip"
+    assert gzip.decompress(call["data"]) == json.dumps(payload).encode()
+
+
+def test_generate_puts_prompt_text_before_file():
+    api = make_api(lambda call: FakeResponse(
+        json_data={"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+    ))
+
+    api.generate("Transcribe this.", file_uri="https://example/files/a")
+    api.generate("Transcribe this.", file_uri="https://example/files/b")
+
+    first_parts = [decode_body(call)["contents"][0]["parts"] for call in api.session.calls]
+    assert [parts[0] for parts in first_parts] == [{"text": "Transcribe this."}] * 2
+    digests = {hashlib.md5(json.dumps(parts[0]).encode()).hexdigest() for parts in first_parts}
+    assert len(digests) == 1
+
+
+def test_template_substitutes_only_the_file_uri():
+    api = make_api(stream_ok)
+    prompt = "Mention __FILE_URI__ literally."
+
+    template = api.prepare_template(prompt=prompt, system_instruction="Rules")
+    text = "".join(api.generate_stream_from_template(template, "https://example/files/a"))
+    "".join(api.generate_stream(prompt, file_uri="https://example/files/a", system_instruction="Rules"))
+
+    assert text == "hello world"
+    from_template, from_payload = api.session.calls
+    assert from_template["data"] == from_payload["data"]
+    parts = decode_body(from_template)["contents"][0]["parts"]
+    assert parts[0] == {"text": prompt}
+    assert parts[1]["file_data"]["file_uri"] == "https://example/files/a"
+
+
+def test_stream_raises_on_error_event():
+    api = make_api(lambda call: FakeResponse(
+        lines=sse(text_event("partial"), {"error": {"code": 500, "message": "internal"}})
+    ))
+
+    with pytest.raises(Exception, match="internal"):
+        "".join(api.generate_stream("p"))
+
+
+def test_stream_requires_finish_reason():
+    api = make_api(lambda call: FakeResponse(lines=sse(text_event("partial"))))
+
+    with pytest.raises(Exception, match="before the response was finished"):
+        "".join(api.generate_stream("p"))
+
+
+def test_stream_accepts_max_tokens_with_warning(capsys):
+    api = make_api(lambda call: FakeResponse(lines=sse(text_event("cut", "MAX_TOKENS"))))
+
+    assert "".join(api.generate_stream("p")) == "cut"
+    assert "Warning" in capsys.readouterr().out
+
+
+def upload_handler(fail_piece=None, lose_finalize=False, received=0):
+    """Answer a resumable upload session, optionally failing one data piece."""
+    state = {"pieces": 0}
+
+    def handler(call):
+        command = call["headers"].get("X-Goog-Upload-Command")
+        if call["url"].startswith("https://generativelanguage.googleapis.com/v1beta/files?"):
+            return FakeResponse(json_data={"files": []})
+        if command == "start":
+            return FakeResponse(headers={"X-Goog-Upload-URL": "https://upload/session"})
+        if command == "query":
+            if lose_finalize:
+                return FakeResponse(
+                    json_data={"file": {"uri": "U", "name": "files/1", "state": "ACTIVE"}},
+                    headers={"X-Goog-Upload-Status": "final"}
+                )
+            return FakeResponse(headers={
+                "X-Goog-Upload-Status": "active", "X-Goog-Upload-Size-Received": str(received)
+            })
+
+        state["pieces"] += 1
+        if state["pieces"] == fail_piece:
+            raise requests.exceptions.ConnectionError("connection reset")
+        if "finalize" in command:
+            return FakeResponse(json_data={"file": {"uri": "U", "name": "files/1", "state": "ACTIVE"}})
+        return FakeResponse()
+
+    return handler
+
+
+def upload_pieces(api):
+    return [
+        (call["headers"]["X-Goog-Upload-Command"], int(call["headers"]["X-Goog-Upload-Offset"]), len(call["data"]))
+        for call in api.session.calls
+        if call["url"] == "https://upload/session" and "X-Goog-Upload-Offset" in call["headers"]
+    ]
+
+
+def test_upload_resumes_from_received_offset(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 25)
+    api = make_api(upload_handler(fail_piece=2, received=10))
+    api.UPLOAD_CHUNK_SIZE = 10
+
+    assert api.upload_file(audio, verbose=False) == ("U", "files/1")
+    assert upload_pieces(api) == [
+        ("upload", 0, 10),
+        ("upload", 10, 10),
+        ("upload", 10, 10),
+        ("upload, finalize", 20, 5),
+    ]
+
+
+def test_upload_recovers_when_finalize_response_is_lost(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 25)
+    api = make_api(upload_handler(fail_piece=3, lose_finalize=True))
+    api.UPLOAD_CHUNK_SIZE = 10
+
+    assert api.upload_file(audio, verbose=False) == ("U", "files/1")
+    assert upload_pieces(api)[-1] == ("upload, finalize", 20, 5)
+
+
+def test_failed_reused_upload_is_uploaded_again(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 5)
+    fresh_upload = upload_handler()
+
+    def handler(call):
+        if call["url"].startswith("https://generativelanguage.googleapis.com/v1beta/files/old"):
+            return FakeResponse(json_data={"state": "FAILED"})
+        return fresh_upload(call)
+
+    api = make_api(handler)
+    existing = {"chunk": {"displayName": "chunk", "state": "PROCESSING", "uri": "OLD", "name": "files/old"}}
+
+    assert api.upload_file(audio, verbose=False, existing_files=existing) == ("U", "files/1")
+
+
+def manifest_handler(remote_state):
+    """Answer uploads, and status checks with remote_state["files/1"] (None for deleted)."""
+    fresh_upload = upload_handler()
+
+    def handler(call):
+        if call["url"].startswith("https://generativelanguage.googleapis.com/v1beta/files/1?"):
+            state = remote_state.get("files/1")
+            if state is None:
+                return FakeResponse(status_code=404, text="not found")
+            return FakeResponse(json_data={"name": "files/1", "state": state})
+        return fresh_upload(call)
+
+    return handler
+
+
+def manifest_api(tmp_path, api_key, remote_state):
+    api = GeminiAPI(api_key=api_key, manifest_path=tmp_path / "manifest.json")
+    api.session = FakeSession(manifest_handler(remote_state))
+    return api
+
+
+def upload_count(api):
+    return sum(call["headers"].get("X-Goog-Upload-Command") == "start" for call in api.session.calls)
+
+
+def test_manifest_reuses_active_upload(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 5)
+    remote_state = {"files/1": "ACTIVE"}
+
+    manifest_api(tmp_path, "KEY_A", remote_state).upload_file(audio, verbose=False, existing_files={})
+    api = manifest_api(tmp_path, "KEY_A", remote_state)
+
+    assert api.upload_file(audio, verbose=False, existing_files={}) == ("U", "files/1")
+    assert upload_count(api) == 0
+
+
+def test_manifest_is_scoped_to_api_key(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 5)
+    remote_state = {"files/1": "ACTIVE"}
+
+    manifest_api(tmp_path, "KEY_A", remote_state).upload_file(audio, verbose=False, existing_files={})
+    api = manifest_api(tmp_path, "KEY_B", remote_state)
+    api.upload_file(audio, verbose=False, existing_files={})
+
+    assert upload_count(api) == 1
+    assert not any("KEY_A" in call["url"] for call in api.session.calls)
+
+
+def test_manifest_drops_deleted_upload(tmp_path):
+    audio = tmp_path / "chunk.wav"
+    audio.write_bytes(b"x" * 5)
+    remote_state = {}
+
+    manifest_api(tmp_path, "KEY_A", remote_state).upload_file(audio, verbose=False, existing_files={})
+    api = manifest_api(tmp_path, "KEY_A", remote_state)
+    api.upload_file(audio, verbose=False, existing_files={})
+
+    assert upload_count(api) == 1
+    # The fresh upload replaced the stale entry, so it is reused once active
+    remote_state["files/1"] = "ACTIVE"
+    api = manifest_api(tmp_path, "KEY_A", remote_state)
+    api.upload_file(audio, verbose=False, existing_files={})
+    assert upload_count(api) == 0
+    assert len(json.loads((tmp_path / "manifest.json").read_text())) == 1
@@ -0,0 +1,202 @@
+"""
+Tests for Transcriber chunking and its end-to-end flow, run against a fake session.
+"""
+
+import hashlib
+import struct
+import wave
+
+import pytest
+
+from gemini_transcribe import Transcriber
+from gemini_transcribe.transcriber import _pcm_wav_duration, _slice_wav_pcm, _write_stream
+
+from .fakes import FakeResponse, FakeSession, decode_body, sse, text_event
+
+RATE = 8000
+
+
+def write_wav(path, seconds, rate=RATE):
+    """Write a mono 16-bit PCM WAV whose samples count up, so slices can be checked."""
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"".join(struct.pack("<h", i % 30011) for i in range(int(seconds * rate))))
+
+
+def set_data_size(path, size):
+    """Overwrite the size field of a WAV file's data chunk."""
+    data = bytearray(path.read_bytes())
+    offset = data.index(b"data") + 4
+    data[offset:offset + 4] = struct.pack("<I", size)
+    path.write_bytes(bytes(data))
+
+
+def test_slice_wav_pcm(tmp_path):
+    src = tmp_path / "in.wav"
+    dst = tmp_path / "out.wav"
+    write_wav(src, 3)
+
+    _slice_wav_pcm(src, 1.5, 1, dst)
+
+    with wave.open(str(dst), "rb") as w:
+        assert w.getnframes() == RATE
+        first, = struct.unpack("<h", w.readframes(1))
+    assert first == int(1.5 * RATE) % 30011
+
+
+def test_slice_wav_pcm_stops_at_end_of_input(tmp_path):
+    src = tmp_path / "in.wav"
+    dst = tmp_path / "out.wav"
+    write_wav(src, 3)
+
+    _slice_wav_pcm(src, 2.5, 10, dst)
+
+    with wave.open(str(dst), "rb") as w:
+        assert w.getnframes() == RATE // 2
+
+
+def test_pcm_wav_duration(tmp_path):
+    path = tmp_path / "in.wav"
+    write_wav(path, 3)
+
+    assert _pcm_wav_duration(path) == 3
+
+
+@pytest.mark.parametrize("size", [0, 0xFFFFFFFF])
+def test_pcm_wav_duration_rejects_unusable_data_size(tmp_path, size):
+    path = tmp_path / "in.wav"
+    write_wav(path, 3)
+    set_data_size(path, size)
+
+    assert _pcm_wav_duration(path) is None
+
+
+def test_write_stream_discards_partial_output(tmp_path):
+    output = tmp_path / "chunk_01.md"
+
+    def pieces():
+        yield "partial"
+        raise Exception("stream cut off")
+
+    with pytest.raises(Exception, match="cut off"):
+        _write_stream(pieces(), output)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_stream_renames_complete_output(tmp_path):
+    output = tmp_path / "chunk_01.md"
+
+    assert _write_stream(iter(["a", "b"]), output, preamble="# H\n") == "ab"
+    assert output.read_text() == "# H\nab"
+
+
+def test_merge_prompt_requires_placeholder(tmp_path):
+    transcriber = Transcriber(api_key="test-key", chunks_dir=str(tmp_path), verbose=False)
+
+    with pytest.raises(ValueError, match="placeholder"):
+        transcriber.merge_transcripts(["text"], "No placeholder here.")
+
+
+def test_merge_cache_key_hashes_model_and_transcript(tmp_path):
+    transcriber = Transcriber(api_key="test-key", chunks_dir=str(tmp_path), verbose=False)
+    combined = "[Chunk 1]\n\nünïcode 😀 " * 200000
+
+    expected = hashlib.sha256(f"{transcriber.api.model}\n{combined}".encode()).hexdigest()[:16]
+    assert transcriber._merge_cache_key(combined) == expected
+
+
+def fake_gemini():
+    """Answer caches, uploads with unique file URIs, and every generation with a short stream."""
+    uploads = []
+
+    def handler(call):
+        command = call["headers"].get("X-Goog-Upload-Command")
+        if "/cachedContents" in call["url"]:
+            return FakeResponse(json_data={"name": "cachedContents/prompt"})
+        if call["method"] == "GET":
+            return FakeResponse(json_data={"files": []})
+        if command == "start":
+            return FakeResponse(headers={"X-Goog-Upload-URL": "https://upload/session"})
+        if command:
+            uploads.append(call)
+            n = len(uploads)
+            return FakeResponse(json_data={"file": {
+                "uri": f"https://example/files/{n}", "name": f"files/{n}", "state": "ACTIVE"
+            }})
+        return FakeResponse(lines=sse(text_event("transcript", "STOP")))
+
+    return handler
+
+
+def test_transcribe_chunk_requests_share_a_static_prefix(tmp_path):
+    audio = tmp_path / "interview.wav"
+    write_wav(audio, 25)
+    transcriber = Transcriber(
+        api_key="test-key", chunk_duration=10, overlap=1,
+        chunks_dir=str(tmp_path / "chunks"), concurrency=2, verbose=False
+    )
+    transcriber.api.session = FakeSession(fake_gemini())
+
+    result = transcriber.transcribe(str(audio), output_file=str(tmp_path / "out.md"))
+
+    assert result == "transcript"
+    chunk_calls = [
+        call for call in transcriber.api.session.calls
+        if b"file_data" in (call["data"] or b"")
+    ]
+    assert len(chunk_calls) == 3
+
+    # Everything ahead of the per-chunk file URI is byte-identical across calls
+    prefixes = {call["data"].split(b"https://example/files/")[0] for call in chunk_calls}
+    assert len(prefixes) == 1
+
+    bodies = [decode_body(call) for call in chunk_calls]
+    digests = {
+        hashlib.md5(str(body["systemInstruction"]["parts"][0]).encode()).hexdigest()
+        for body in bodies
+    }
+    assert len(digests) == 1
+    assert sorted(body["contents"][0]["parts"][-1]["file_data"]["file_uri"] for body in bodies) == [
+        "https://example/files/1", "https://example/files/2", "https://example/files/3"
+    ]
+
+
+def test_transcribe_resumes_from_saved_chunks(tmp_path):
+    audio = tmp_path / "interview.wav"
+    write_wav(audio, 25)
+    transcriber = Transcriber(
+        api_key="test-key", chunk_duration=10, overlap=1,
+        chunks_dir=str(tmp_path / "chunks"), verbose=False
+    )
+    transcriber.api.session = FakeSession(fake_gemini())
+    transcriber.transcribe(str(audio), output_file=str(tmp_path / "out.md"))
+
+    transcriber.api.session = FakeSession(fake_gemini())
+    transcriber.transcribe(str(audio), output_file=str(tmp_path / "out.md"))
+
+    assert not any(b"file_data" in (call["data"] or b"") for call in transcriber.api.session.calls)
+
+
+def test_prompt_cache_is_only_created_when_a_chunk_needs_transcribing(tmp_path):
+    audio = tmp_path / "interview.wav"
+    write_wav(audio, 25)
+    transcriber = Transcriber(
+        api_key="test-key", chunk_duration=10, overlap=1,
+        chunks_dir=str(tmp_path / "chunks"), concurrency=3, verbose=False
+    )
+    chunk_prompt = "Transcribe the audio. " * 1000
+
+    transcriber.api.session = FakeSession(fake_gemini())
+    transcriber.transcribe(str(audio), output_file=str(tmp_path / "out.md"), chunk_prompt=chunk_prompt)
+    cache_calls = [
+        call["method"] for call in transcriber.api.session.calls if "/cachedContents" in call["url"]
+    ]
+    assert cache_calls == ["POST", "DELETE"]
+
+    transcriber.api.session = FakeSession(fake_gemini())
+    transcriber.transcribe(str(audio), output_file=str(tmp_path / "out.md"), chunk_prompt=chunk_prompt)
+    assert not any("/cachedContents" in call["url"] for call in transcriber.api.session.calls)
+    assert not any(call["method"] == "GET" for call in transcriber.api.session.calls)